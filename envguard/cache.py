@@ -0,0 +1,55 @@
+"""Persistent scan cache so unchanged files are not re-scanned."""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+# Layout of manifest entries; manifests in any other layout are discarded.
+MANIFEST_FORMAT = 2
+
+def cache_dir() -> Path:
+    """Directory holding cache manifests (honours XDG_CACHE_HOME)."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'envguard'
+
+def manifest_path(root: str) -> Path:
+    """One manifest per scanned root, named after its absolute path."""
+    digest = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()
+    return cache_dir() / f"{digest}.json"
+
+def load_manifest(root: str, version: str) -> Dict[str, Any]:
+    """Load the manifest for root, or an empty one if missing or stale.
+
+    ``files`` maps absolute paths to ``[mtime_ns, size, digest, usages]``
+    where usages is a list of ``[var_name, line_number, usage_type]``.
+    """
+    try:
+        with open(manifest_path(root), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if (manifest.get('format') == MANIFEST_FORMAT
+                and manifest.get('version') == version
+                and isinstance(manifest.get('files'), dict)):
+            return manifest
+    except (IOError, OSError, ValueError):
+        pass
+    return {'format': MANIFEST_FORMAT, 'version': version, 'files': {}}
+
+def save_manifest(root: str, manifest: Dict[str, Any]) -> None:
+    """Atomically write the manifest; failures only cost the cache."""
+    path = manifest_path(root)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                # dumps runs the C encoder; dump streams through the
+                # pure-Python one, chunk by chunk.
+                f.write(json.dumps(manifest, separators=(',', ':')))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except (IOError, OSError):
+        pass
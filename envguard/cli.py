@@ -1,6 +1,7 @@
 import click
 from pathlib import Path
-from .scanners.code_scanner import scan_directory, get_unique_vars
+from . import __version__
+from .scanners.code_scanner import iter_scan_directory
 from .scanners.env_scanner import parse_env_file, find_env_file, find_missing, find_orphaned
 
 try:
@@ -11,6 +12,16 @@ try:
 except ImportError:
     RICH = False
 
+def _first_usages(usages):
+    """Index usages by var name, keeping the first reference of each."""
+    first = {}
+    for u in usages:
+        first.setdefault(u.var_name, u)
+    return first
+
+def _ref(usage):
+    return f"{Path(usage.filename).name}:{usage.line_number}" if usage else ""
+
 @click.group(invoke_without_command=True)
 @click.pass_context
 def main(ctx):
@@ -23,13 +34,21 @@ def main(ctx):
 @click.option('--strict', is_flag=True, help='Exit code 1 if issues found')
 @click.option('--env-file', default=None, help='Path to .env.example file')
 @click.option('--actions', is_flag=True, help='Also scan GitHub Actions workflows')
-def scan(path, strict, env_file, actions):
+@click.option('--workers', type=click.IntRange(min=1), default=None, help='Parallel scan processes (default: one per CPU)')
+@click.option('--no-cache', is_flag=True, help='Rescan every file instead of reusing cached results')
+def scan(path, strict, env_file, actions, workers, no_cache):
     """Scan for missing or orphaned environment variables."""
     from .scanners.actions_scanner import scan_actions_directory, get_github_secret_names
 
-    # Code scanning
-    usages = scan_directory(path)
-    code_vars = get_unique_vars(usages)
+    # Code scanning: usages are consumed as they stream in, keeping only
+    # the var names, each var's first reference and the files seen.
+    code_vars = set()
+    first_usage = {}
+    scanned_files = set()
+    for u in iter_scan_directory(path, workers=workers, cache=not no_cache):
+        code_vars.add(u.var_name)
+        first_usage.setdefault(u.var_name, u)
+        scanned_files.add(u.filename)
 
     # GitHub Actions scanning
     actions_vars = set()
@@ -38,6 +57,8 @@ def scan(path, strict, env_file, actions):
         actions_usages = scan_actions_directory(path)
         actions_vars = get_github_secret_names(actions_usages)
         code_vars = code_vars | actions_vars
+        for u in actions_usages:
+            first_usage.setdefault(u.var_name, u)
 
     env_path = env_file or find_env_file(path)
     env_vars = parse_env_file(env_path) if env_path else set()
@@ -45,10 +66,10 @@ def scan(path, strict, env_file, actions):
     missing = find_missing(code_vars, env_vars)
     orphaned = find_orphaned(code_vars, env_vars)
 
-    file_count = len({u.filename for u in usages})
+    file_count = len(scanned_files)
 
     if RICH:
-        console.print(f"\n[bold]envguard[/bold] v0.0.6\n")
+        console.print(f"\n[bold]envguard[/bold] v{__version__}\n")
         console.print(f"Scanning: {path} ({file_count} files)")
         if env_path:
             console.print(f"Env file: {env_path}\n")
@@ -57,19 +78,15 @@ def scan(path, strict, env_file, actions):
 
         if actions and actions_vars:
             console.print(f"[bold blue]GitHub Actions Secrets ({len(actions_vars)})[/bold blue]")
+            first_actions_usage = _first_usages(actions_usages)
             for var in sorted(actions_vars):
-                refs = [(u.filename, u.line_number) for u in actions_usages if u.var_name == var]
-                ref_str = f"{Path(refs[0][0]).name}:{refs[0][1]}" if refs else ""
-                console.print(f"  [blue]{var}[/blue]   {ref_str}")
+                console.print(f"  [blue]{var}[/blue]   {_ref(first_actions_usage.get(var))}")
             console.print()
 
         if missing:
             console.print(f"[red bold]MISSING in .env.example ({len(missing)})[/red bold]")
             for var in sorted(missing):
-                all_usages = usages + actions_usages
-                refs = [(u.filename, u.line_number) for u in all_usages if u.var_name == var]
-                ref_str = f"{Path(refs[0][0]).name}:{refs[0][1]}" if refs else ""
-                console.print(f"  [red]{var}[/red]   {ref_str}")
+                console.print(f"  [red]{var}[/red]   {_ref(first_usage.get(var))}")
 
         if orphaned:
             console.print(f"\n[yellow bold]ORPHANED in .env.example ({len(orphaned)})[/yellow bold]")
@@ -82,7 +99,7 @@ def scan(path, strict, env_file, actions):
             total = len(missing) + len(orphaned)
             console.print(f"\n[red]✗ {total} issue(s) found.[/red]\n")
     else:
-        print(f"envguard v0.0.6 — Scanning: {path}")
+        print(f"envguard v{__version__} — Scanning: {path}")
         if actions and actions_vars:
             print(f"\nGitHub Actions Secrets ({len(actions_vars)}):")
             for var in sorted(actions_vars):
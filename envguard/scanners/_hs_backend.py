@@ -0,0 +1,58 @@
+"""Optional Hyperscan backend for locating scanner match candidates."""
+import re
+import threading
+from typing import Dict, List, Tuple
+
+try:
+    import hyperscan
+    AVAILABLE = True
+except ImportError:
+    AVAILABLE = False
+
+# One database per probe tuple, compiled on first use so importing the
+# scanner stays cheap. Databases are read-only and shared; scratch space
+# is not, so each thread allocates its own.
+_databases: Dict[Tuple[bytes, ...], "hyperscan.Database"] = {}
+_compile_lock = threading.Lock()
+_local = threading.local()
+
+def _database(probes: Tuple[bytes, ...]):
+    db = _databases.get(probes)
+    if db is None:
+        with _compile_lock:
+            db = _databases.get(probes)
+            if db is None:
+                db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+                db.compile(
+                    expressions=[re.escape(probe) for probe in probes],
+                    ids=list(range(len(probes))),
+                    elements=len(probes),
+                )
+                _databases[probes] = db
+    return db
+
+def _scratch(probes: Tuple[bytes, ...], db):
+    scratches = getattr(_local, 'scratches', None)
+    if scratches is None:
+        scratches = _local.scratches = {}
+    scratch = scratches.get(probes)
+    if scratch is None:
+        scratch = scratches[probes] = hyperscan.Scratch(db)
+    return scratch
+
+def find_literals(content, probes: Tuple[bytes, ...]) -> List[int]:
+    """Sorted start offsets of every occurrence of any probe.
+
+    All probes are matched in a single pass over content. Hyperscan only
+    reports end offsets for plain literals, so starts are derived from the
+    matched probe's length.
+    """
+    offsets = []
+
+    def on_match(probe_id, start, end, flags, context):
+        offsets.append(end - len(probes[probe_id]))
+
+    db = _database(probes)
+    db.scan(content, match_event_handler=on_match, scratch=_scratch(probes, db))
+    offsets.sort()
+    return offsets
@@ -0,0 +1,72 @@
+"""Regex sources shared by the scanners, compiled on first use.
+
+Nothing is compiled at import, so loading envguard (the CLI, or a worker
+process) costs no regex compilation, and each pattern is compiled once
+per process by whichever scanner asks for it first.
+"""
+import re
+import sys
+from functools import cache
+from typing import Dict, Tuple
+
+# Usage types: a small closed set shared by every EnvUsage. String
+# constants are interned, so comparisons against them are identity checks.
+PYTHON_ENVIRON = sys.intern("python_environ")
+PYTHON_ENVIRON_GET = sys.intern("python_environ_get")
+PYTHON_GETENV = sys.intern("python_getenv")
+CONFIG_ATTR = sys.intern("config_attr")
+SETTINGS_ATTR = sys.intern("settings_attr")
+JS_PROCESS_ENV = sys.intern("js_process_env")
+JS_PROCESS_ENV_BRACKET = sys.intern("js_process_env_bracket")
+VITE_ENV = sys.intern("vite_env")
+
+# Patterns are bytes: files are matched undecoded. Each has exactly one
+# capture group, holding the var name. Bytes \w is ASCII-only, so a name
+# running into a non-ASCII byte is rejected rather than truncated.
+PYTHON_PATTERNS = [
+    (rb'os\.environ\[[\'"]([\w]+)(?![\w\x80-\xff])[\'"]\]', PYTHON_ENVIRON),
+    (rb'os\.environ\.get\([\'\"]([\w]+)(?![\w\x80-\xff])[\'\"]\)', PYTHON_ENVIRON_GET),
+    (rb'os\.getenv\([\'\"]([\w]+)(?![\w\x80-\xff])[\'\"]\)', PYTHON_GETENV),
+    (rb'config\.([\w]+)(?![\w\x80-\xff])', CONFIG_ATTR),
+    (rb'settings\.([\w]+)(?![\w\x80-\xff])', SETTINGS_ATTR),
+]
+
+JS_PATTERNS = [
+    (rb'process\.env\.([\w]+)(?![\w\x80-\xff])', JS_PROCESS_ENV),
+    (rb'process\.env\[[\'\"]([\w]+)(?![\w\x80-\xff])[\'\"]\]', JS_PROCESS_ENV_BRACKET),
+    (rb'import\.meta\.env\.([\w]+)(?![\w\x80-\xff])', VITE_ENV),
+]
+
+LANG_SOURCES = {
+    'python': PYTHON_PATTERNS,
+    'js': JS_PATTERNS,
+}
+
+# Lines whose first non-blank characters open a comment are skipped.
+COMMENT_LINE_SOURCE = rb'(?m)^[^\S\n]*(?:#|//)'
+
+# ${{ secrets.VAR_NAME }} (group 1) or ${{ env.VAR_NAME }} (group 2), in
+# one pass. Secret names must already be upper-case; env names are
+# upper-cased after matching.
+ACTIONS_REF_SOURCE = rb'\$\{\{\s*(?:secrets\.([A-Z0-9_]+)|env\.([A-Z0-9_a-z_]+))\s*\}\}'
+
+@cache
+def code_regex(lang: str) -> Tuple["re.Pattern", Dict[int, str]]:
+    """One alternation of lang's patterns, and a map from group index
+    (``match.lastindex``) to usage type."""
+    fused = re.compile(b'|'.join(
+        b'(?P<%s>%s)' % (usage_type.encode('ascii'), source)
+        for source, usage_type in LANG_SOURCES[lang]
+    ))
+    return fused, {
+        index: sys.intern(name)
+        for name, index in fused.groupindex.items()
+    }
+
+@cache
+def comment_line_regex():
+    return re.compile(COMMENT_LINE_SOURCE)
+
+@cache
+def actions_regex():
+    return re.compile(ACTIONS_REF_SOURCE)
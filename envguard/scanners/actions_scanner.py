@@ -1,8 +1,27 @@
 """Scan GitHub Actions YAML files for secret/env var references."""
-import re
+import os
+import sys
 from pathlib import Path
 from typing import List, Set
-from ..scanners.code_scanner import EnvUsage
+from .code_scanner import EnvUsage
+from ._patterns import actions_regex
+
+GITHUB_SECRET = sys.intern("github_secret")
+GITHUB_ENV = sys.intern("github_env")
+
+def _numbered(regex, text: bytes):
+    """Yield (line_number, match) pairs for regex over text.
+
+    finditer reports matches in order, so newlines are counted only
+    between consecutive matches: one pass over text in total instead of
+    recounting from the top of the file for every match.
+    """
+    line_number = 1
+    counted = 0
+    for match in regex.finditer(text):
+        line_number += text.count(b'\n', counted, match.start())
+        counted = match.start()
+        yield line_number, match
 
 def scan_actions_directory(repo_path: str) -> List[EnvUsage]:
     """Scan .github/workflows/*.yml for secrets.VAR and env.VAR references."""
@@ -22,31 +41,32 @@ def scan_actions_file(filepath: str) -> List[EnvUsage]:
     """Scan a single GitHub Actions YAML file."""
     usages = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        with open(filepath, 'rb') as f:
+            text = f.read()
     except (IOError, OSError):
         return usages
+    # Every reference is an expression; most steps contain none.
+    if b'${{' not in text:
+        return usages
     
-    for i, line in enumerate(lines, 1):
-        # ${{ secrets.VAR_NAME }}
-        for match in re.finditer(r'\$\{\{\s*secrets\.([A-Z0-9_]+)\s*\}\}', line):
-            usages.append(EnvUsage(
-                var_name=match.group(1),
-                filename=filepath,
-                line_number=i,
-                usage_type="github_secret"
-            ))
-        # ${{ env.VAR_NAME }} or env: VAR_NAME: value
-        for match in re.finditer(r'\$\{\{\s*env\.([A-Z0-9_a-z_]+)\s*\}\}', line):
-            usages.append(EnvUsage(
-                var_name=match.group(1).upper(),
-                filename=filepath,
-                line_number=i,
-                usage_type="github_env"
-            ))
+    filepath = sys.intern(os.fspath(filepath))
+    # Only ${{ }} references matter, so there is no YAML parse: one
+    # pattern runs over the raw bytes and offsets become line numbers.
+    # Names are ASCII by construction; nothing else is decoded.
+    for line_number, match in _numbered(actions_regex(), text):
+        if match.lastindex == 1:
+            var_name, usage_type = match.group(1).decode('ascii'), GITHUB_SECRET
+        else:
+            var_name, usage_type = match.group(2).decode('ascii').upper(), GITHUB_ENV
+        usages.append(EnvUsage(
+            var_name=sys.intern(var_name),
+            filename=filepath,
+            line_number=line_number,
+            usage_type=usage_type
+        ))
     
     return usages
 
 def get_github_secret_names(usages: List[EnvUsage]) -> Set[str]:
     """Get all secret names referenced in Actions."""
-    return {u.var_name for u in usages if u.usage_type == "github_secret"}
+    return {u.var_name for u in usages if u.usage_type == GITHUB_SECRET}
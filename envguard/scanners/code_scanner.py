@@ -1,28 +1,48 @@
-import re
+import hashlib
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from pathlib import Path
-from typing import List, Set
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
 
-@dataclass
+import pathspec
+
+from ..cache import MANIFEST_FORMAT, load_manifest, save_manifest
+from . import _hs_backend
+from ._patterns import (
+    COMMENT_LINE_SOURCE, JS_PATTERNS, PYTHON_PATTERNS, code_regex, comment_line_regex,
+)
+
+@dataclass(frozen=True)
 class EnvUsage:
+    # Slotted and immutable: large scans create tens of thousands of these.
+    __slots__ = ('var_name', 'filename', 'line_number', 'usage_type')
+
     var_name: str
     filename: str
     line_number: int
     usage_type: str  # "python_environ", "python_getenv", "js_process_env"
 
-PYTHON_PATTERNS = [
-    (r'os\.environ\[[\'"]([\w]+)[\'"]\]', "python_environ"),
-    (r'os\.environ\.get\([\'\"]([\w]+)[\'\"]\)', "python_environ_get"),
-    (r'os\.getenv\([\'\"]([\w]+)[\'\"]\)', "python_getenv"),
-    (r'config\.([\w]+)', "config_attr"),
-    (r'settings\.([\w]+)', "settings_attr"),
-]
+    def __reduce__(self):
+        # Default slot-state unpickling assigns attributes, which a frozen
+        # dataclass rejects; rebuild through __init__ for the process pool.
+        return (EnvUsage, (self.var_name, self.filename, self.line_number, self.usage_type))
+
+# Every pattern of a language begins with one of these literals, so
+# bytes.find locates all candidate match offsets and the fused regex only
+# has to confirm them. Files with no candidates never reach the regex.
+PROBES = {
+    'python': (b'os.environ', b'os.getenv', b'config.', b'settings.'),
+    'js': (b'process.env', b'import.meta.env.'),
+}
 
-JS_PATTERNS = [
-    (r'process\.env\.([\w]+)', "js_process_env"),
-    (r'process\.env\[[\'\"]([\w]+)[\'\"]\]', "js_process_env_bracket"),
-    (r'import\.meta\.env\.([\w]+)', "vite_env"),
-]
+# Cached scan results are only valid for the patterns that produced them;
+# bump the leading number when scan_file's matching logic changes.
+SCANNER_VERSION = '2-' + hashlib.sha1(repr([
+    (source, usage_type)
+    for source, usage_type in PYTHON_PATTERNS + JS_PATTERNS
+] + [COMMENT_LINE_SOURCE]).encode('utf-8')).hexdigest()[:12]
 
 SUPPORTED_EXTENSIONS = {
     '.py': 'python',
@@ -33,47 +53,269 @@ SUPPORTED_EXTENSIONS = {
     '.mjs': 'js',
 }
 
-def scan_file(filepath: str) -> List[EnvUsage]:
-    usages = []
-    path = Path(filepath)
-    lang = SUPPORTED_EXTENSIONS.get(path.suffix, None)
+# For str.endswith checks on directory entry names.
+SOURCE_SUFFIXES = tuple(SUPPORTED_EXTENSIONS)
+
+# Directory names that are never descended into: VCS metadata, installed
+# dependencies, virtualenvs, build output and tool caches.
+IGNORE_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', '.venv', 'venv', 'dist', 'build',
+    '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.ruff_cache',
+})
+
+def _candidates(content, probes) -> List[int]:
+    """Sorted offsets at which any of the literal probes occurs."""
+    if _hs_backend.AVAILABLE:
+        return _hs_backend.find_literals(content, probes)
+    offsets = []
+    for probe in probes:
+        i = content.find(probe)
+        while i != -1:
+            offsets.append(i)
+            i = content.find(probe, i + 1)
+    offsets.sort()
+    return offsets
+
+def scan_buffer(content, lang: str) -> List[Tuple[str, int, str]]:
+    """Return (var_name, line_number, usage_type) for each reference in content."""
+    records = []
+    offsets = _candidates(content, PROBES[lang])
+    if not offsets:
+        return records
+    regex, usage_types = code_regex(lang)
+    comment_line = comment_line_regex()
+    # Matches arrive in offset order, so line numbers are a running count
+    # of the newlines between consecutive matches; no per-line index.
+    line_number = 1
+    counted = 0
+    # End of the last match of each alternative. Like running finditer
+    # once per pattern, a match never starts inside an earlier match of
+    # the same pattern, but may overlap other patterns' matches:
+    # config.settings.FOO is both config.SETTINGS and settings.FOO.
+    ends = {}
+    for start in offsets:
+        match = regex.match(content, start)
+        if match is None:
+            continue
+        group = match.lastindex
+        if start < ends.get(group, 0):
+            continue
+        ends[group] = match.end()
+        line_number += content[counted:start].count(b'\n')
+        counted = start
+        if comment_line.match(content, content.rfind(b'\n', 0, start) + 1):
+            continue
+        # Env var names are ASCII; bytes \w never matches more.
+        var_name = sys.intern(match.group(group + 1).decode('ascii').upper())
+        # Filter out noise
+        if len(var_name) < 2 or var_name.isdigit():
+            continue
+        records.append((var_name, line_number, usage_types[group]))
+    return records
+
+# Files at least this large are memory-mapped; below it, the mmap setup
+# and teardown syscalls cost more than one read() copy.
+MMAP_THRESHOLD = 256 * 1024
+
+# Digest reported for a file that could not be read. Such a result is
+# never cached, so the file is retried on the next run.
+_UNREADABLE = 'unreadable'
+
+def _scan_content(content, lang: str, known: Optional[FrozenSet[str]]):
+    if known is None:
+        return scan_buffer(content, lang), None
+    digest = lang + ':' + hashlib.sha1(content).hexdigest()
+    if digest in known:
+        return None, digest
+    return scan_buffer(content, lang), digest
+
+def _scan_path(filepath: str, known: Optional[FrozenSet[str]] = None):
+    """Scan one file into (records, digest).
+
+    records is None if digest is in known; digest is _UNREADABLE on read errors.
+    """
+    lang = SUPPORTED_EXTENSIONS.get(os.path.splitext(filepath)[1])
     if not lang:
-        return usages
-    
-    patterns = PYTHON_PATTERNS if lang == 'python' else JS_PATTERNS
-    
+        return [], None
+
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-    except (IOError, OSError):
-        return usages
-    
-    for i, line in enumerate(lines, 1):
-        stripped = line.strip()
-        if stripped.startswith('#') or stripped.startswith('//'):
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0 and known is None:
+                return [], None
+            if size < MMAP_THRESHOLD:
+                return _scan_content(f.read(), lang, known)
+            # Map large files instead of copying them: matching runs
+            # straight over the page cache.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return _scan_content(content, lang, known)
+    except (IOError, OSError, ValueError):
+        return [], _UNREADABLE
+
+def _usages(filepath: str, records) -> List[EnvUsage]:
+    # Names repeat across thousands of usages; share one string for each.
+    filepath = sys.intern(filepath)
+    return [EnvUsage(var_name, filepath, line_number, usage_type)
+            for var_name, line_number, usage_type in records]
+
+def scan_file(filepath: str) -> List[EnvUsage]:
+    filepath = os.fspath(filepath)
+    return _usages(filepath, _scan_path(filepath)[0])
+
+# Read from the scan root; their patterns prune the walk like .gitignore
+# does for git (.envguardignore is for paths git tracks but envguard
+# should not scan).
+IGNORE_FILES = ('.gitignore', '.envguardignore')
+
+def load_ignore_spec(root: str) -> Optional[pathspec.GitIgnoreSpec]:
+    """Patterns from the ignore files at root, or None if there are none."""
+    lines = []
+    for name in IGNORE_FILES:
+        try:
+            with open(os.path.join(root, name), 'r', encoding='utf-8', errors='replace') as f:
+                lines.extend(f.read().splitlines())
+        except (IOError, OSError):
             continue
-        for pattern, usage_type in patterns:
-            for match in re.finditer(pattern, line):
-                var_name = match.group(1).upper()
-                # Filter out noise
-                if len(var_name) < 2 or var_name.isdigit():
-                    continue
-                usages.append(EnvUsage(
-                    var_name=var_name,
-                    filename=filepath,
-                    line_number=i,
-                    usage_type=usage_type
-                ))
-    return usages
-
-def scan_directory(path: str) -> List[EnvUsage]:
-    usages = []
-    ignore_dirs = {'.git', 'node_modules', '__pycache__', '.venv', 'venv', 'dist', 'build'}
-    for p in Path(path).rglob('*'):
-        if p.is_file() and p.suffix in SUPPORTED_EXTENSIONS:
-            if not any(d in p.parts for d in ignore_dirs):
-                usages.extend(scan_file(str(p)))
-    return usages
-
-def get_unique_vars(usages: List[EnvUsage]) -> Set[str]:
+    spec = pathspec.GitIgnoreSpec.from_lines(lines)
+    return spec if len(spec) else None
+
+def _walk(root: str, skip: FrozenSet[str], suffixes: Tuple[str, ...],
+          spec: Optional[pathspec.GitIgnoreSpec] = None) -> Iterator[str]:
+    """Yield source files under root, pruning skipped and ignored directories."""
+    # Each directory is stacked with its '/'-separated path relative to
+    # root, which is what spec matches against.
+    stack = [(root, '')]
+    while stack:
+        subdirs = []
+        directory, rel = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in skip:
+                            continue
+                        if spec is not None and spec.match_file(rel + entry.name + '/'):
+                            continue
+                        subdirs.append((entry.path, rel + entry.name + '/'))
+                    elif entry.name.endswith(suffixes) and entry.is_file():
+                        if spec is not None and spec.match_file(rel + entry.name):
+                            continue
+                        yield entry.path
+        except OSError:
+            continue
+        stack.extend(reversed(subdirs))
+
+# Below this many files, starting worker processes costs more than it saves.
+MIN_PARALLEL_FILES = 16
+
+# Digests whose usages the parent already has; set per pool worker.
+_known_digests: FrozenSet[str] = frozenset()
+
+def _set_known_digests(known: FrozenSet[str]) -> None:
+    global _known_digests
+    _known_digests = known
+
+def _scan_file_digest(filepath: str, known: Optional[FrozenSet[str]] = None):
+    """``(usages, digest)`` for filepath; usages is None if digest is known."""
+    records, digest = _scan_path(filepath, _known_digests if known is None else known)
+    return (None if records is None else _usages(filepath, records)), digest
+
+def _scan_files(files: List[str], workers: Optional[int],
+                known: Optional[FrozenSet[str]] = None) -> Iterator:
+    """Yield per-file scan results in order, in-process or from a process pool."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(files) < MIN_PARALLEL_FILES:
+        for filepath in files:
+            yield scan_file(filepath) if known is None else _scan_file_digest(filepath, known)
+        return
+    # Up to 32 files per task, but small trees still get a few tasks per
+    # worker, and no worker is started without a chunk to scan.
+    chunksize = min(32, -(-len(files) // (workers * 4)))
+    workers = min(workers, -(-len(files) // chunksize))
+    if known is None:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(scan_file, files, chunksize=chunksize)
+        return
+    # Sent once per worker rather than with every chunk of files.
+    with ProcessPoolExecutor(max_workers=workers, initializer=_set_known_digests,
+                             initargs=(known,)) as executor:
+        yield from executor.map(_scan_file_digest, files, chunksize=chunksize)
+
+def iter_scan_directory(path: str, workers: Optional[int] = None,
+                        cache: bool = False) -> Iterator[EnvUsage]:
+    """Yield usages from every supported file under path.
+
+    workers=None uses one process per CPU; cache=True reuses results of unchanged files.
+    """
+    # Bucket files by language and run the biggest bucket first, so each
+    # pool chunk works through files sharing one compiled pattern set.
+    buckets = {}
+    spec = load_ignore_spec(path)
+    for filepath in _walk(path, IGNORE_DIRS, SOURCE_SUFFIXES, spec):
+        lang = SUPPORTED_EXTENSIONS.get(os.path.splitext(filepath)[1])
+        if lang:
+            buckets.setdefault(lang, []).append(filepath)
+    files = [
+        filepath
+        for bucket in sorted(buckets.values(), key=len, reverse=True)
+        for filepath in bucket
+    ]
+    if not cache:
+        for result in _scan_files(files, workers):
+            yield from result
+        return
+
+    cached = load_manifest(path, SCANNER_VERSION)['files']
+    # Usages depend only on content and language, so key by both.
+    by_digest = {entry[2]: entry[3] for entry in cached.values() if entry[2]}
+    entries = {}
+    plan = []  # (filepath, key, stamp, cached entry or None)
+    for filepath in files:
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            continue
+        key = os.path.abspath(filepath)
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = cached.get(key)
+        if entry and entry[:2] == stamp:
+            entries[key] = entry
+            plan.append((filepath, key, stamp, entry))
+        else:
+            plan.append((filepath, key, stamp, None))
+
+    # Stamp misses are hashed by the scan itself, from the bytes it reads
+    # anyway; a digest already in the manifest skips the regex pass.
+    misses = [filepath for filepath, _, _, entry in plan if entry is None]
+    scanned = _scan_files(misses, workers, frozenset(by_digest))
+    for filepath, key, stamp, entry in plan:
+        if entry is None:
+            result, digest = next(scanned)
+            if digest == _UNREADABLE:
+                continue
+            if result is not None:
+                entries[key] = stamp + [digest, [
+                    [u.var_name, u.line_number, u.usage_type] for u in result
+                ]]
+                yield from result
+                continue
+            entry = entries[key] = stamp + [digest, by_digest[digest]]
+        filepath = sys.intern(filepath)
+        for var, line, kind in entry[3]:
+            yield EnvUsage(sys.intern(var), filepath, line, kind)
+    scanned.close()
+    # Rewriting with only this run's files also drops deleted ones.
+    if entries != cached:
+        save_manifest(path, {
+            'format': MANIFEST_FORMAT, 'version': SCANNER_VERSION, 'files': entries,
+        })
+
+def scan_directory(path: str, workers: Optional[int] = None,
+                   cache: bool = False) -> List[EnvUsage]:
+    """List form of iter_scan_directory."""
+    return list(iter_scan_directory(path, workers=workers, cache=cache))
+
+def get_unique_vars(usages: Iterable[EnvUsage]) -> Set[str]:
+    """Var names referenced by usages (any iterable, e.g. a scan stream)."""
     return {u.var_name for u in usages}
\ No newline at end of file
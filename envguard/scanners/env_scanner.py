@@ -1,23 +1,34 @@
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Set, Optional, Dict
+from typing import FrozenSet, Set, Optional, Dict
 
-def parse_env_file(filepath: str) -> Set[str]:
-    """Parse .env or .env.example, return set of variable names."""
-    vars = set()
+# KEY=value or KEY=, optionally prefixed with `export`. Comment lines
+# can't match because a name never starts with '#'.
+ENV_LINE = re.compile(rb'(?m)^[ \t]*(?:export[ \t]+)?(\w+)[ \t]*=')
+
+@lru_cache(maxsize=256)
+def _parse_env_file(filepath: str, mtime_ns: int, size: int) -> FrozenSet[str]:
+    """Parse one version of an env file; the stamp args only key the cache."""
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                # KEY=value or KEY=
-                match = re.match(r'^([\w]+)\s*=', line)
-                if match:
-                    vars.add(match.group(1).upper())
+        with open(filepath, 'rb') as f:
+            data = f.read()
     except (IOError, OSError):
-        pass
-    return vars
+        return frozenset()
+    return frozenset(name.decode('ascii').upper() for name in ENV_LINE.findall(data))
+
+def parse_env_file(filepath: str) -> Set[str]:
+    """Parse .env or .env.example, return set of variable names.
+
+    Results are memoized per (path, mtime, size), so re-reading an
+    unchanged file is free and an edited one is parsed again.
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return set()
+    return set(_parse_env_file(filepath, st.st_mtime_ns, st.st_size))
 
 def find_env_file(directory: str) -> Optional[str]:
     """Find .env.example or .env in directory."""
@@ -27,12 +38,22 @@ def find_env_file(directory: str) -> Optional[str]:
             return str(p)
     return None
 
+# Set by the OS or shell, never expected in .env.example; reporting them
+# as missing would be a false positive.
+SYSTEM_VARS = frozenset({'PATH', 'HOME', 'USER', 'SHELL', 'PWD', 'TERM', 'LANG', 'LC_ALL'})
+
 def find_missing(code_vars: Set[str], env_vars: Set[str]) -> Set[str]:
     """Vars used in code but not in .env.example (potential missing config)."""
-    # Filter out common false positives
-    noise = {'PATH', 'HOME', 'USER', 'SHELL', 'PWD', 'TERM', 'LANG', 'LC_ALL'}
-    return (code_vars - env_vars) - noise
+    if not code_vars:
+        return set()
+    if not env_vars:
+        return code_vars - SYSTEM_VARS
+    return code_vars.difference(env_vars, SYSTEM_VARS)
 
 def find_orphaned(code_vars: Set[str], env_vars: Set[str]) -> Set[str]:
     """Vars in .env.example but not referenced in code."""
+    if not env_vars:
+        return set()
+    if not code_vars:
+        return set(env_vars)
     return env_vars - code_vars
\ No newline at end of file
@@ -84,3 +84,22 @@ def test_get_github_secret_names():
     ]
     secret_names = get_github_secret_names(usages)
     assert secret_names == {"API_KEY", "DB_PASSWORD"}
+
+def test_scan_actions_file_mixed_references(workflows_dir):
+    """Test secrets and env references interleaved on one line."""
+    yml_file = workflows_dir / "mixed.yml"
+    yml_file.write_text(
+        "name: Mixed\n"
+        "run: deploy ${{ env.stage }} ${{ secrets.DEPLOY_TOKEN }} ${{ github.sha }}\n"
+    )
+    usages = scan_actions_file(str(yml_file))
+    assert usages == [
+        EnvUsage("STAGE", str(yml_file), 2, "github_env"),
+        EnvUsage("DEPLOY_TOKEN", str(yml_file), 2, "github_secret"),
+    ]
+
+def test_scan_actions_file_accepts_path(workflows_dir):
+    yml_file = workflows_dir / "ci.yml"
+    yml_file.write_text("steps:\n  - run: echo ${{ secrets.API_KEY }}\n")
+    usages = scan_actions_file(yml_file)
+    assert usages == [EnvUsage("API_KEY", str(yml_file), 2, "github_secret")]
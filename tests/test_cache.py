@@ -0,0 +1,99 @@
+import os
+import pytest
+from envguard.cache import MANIFEST_FORMAT, load_manifest, manifest_path, save_manifest
+from envguard.scanners.code_scanner import SCANNER_VERSION, scan_directory
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Keep manifests out of the real user cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "app.py").write_text("import os\nkey = os.getenv('API_KEY')\n")
+    return root
+
+def test_manifest_round_trip(project):
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'version': SCANNER_VERSION,
+        'files': {'/x.py': [1, 2, 'python:abc', [['A', 1, 't']]]},
+    }
+    save_manifest(str(project), manifest)
+    assert load_manifest(str(project), SCANNER_VERSION) == manifest
+
+def test_manifest_version_mismatch_is_discarded(project):
+    save_manifest(str(project), {
+        'format': MANIFEST_FORMAT, 'version': 'old', 'files': {'/x.py': [1, 2, None, []]},
+    })
+    assert load_manifest(str(project), SCANNER_VERSION)['files'] == {}
+
+def test_cached_scan_reuses_unchanged_files(project):
+    first = scan_directory(str(project), workers=1, cache=True)
+    assert manifest_path(str(project)).exists()
+
+    # Poison the cached entry: a hit must come back from the manifest.
+    manifest = load_manifest(str(project), SCANNER_VERSION)
+    key = os.path.abspath(str(project / "app.py"))
+    manifest['files'][key][3] = [['FROM_CACHE', 2, 'python_getenv']]
+    save_manifest(str(project), manifest)
+
+    second = scan_directory(str(project), workers=1, cache=True)
+    assert [u.var_name for u in first] == ['API_KEY']
+    assert [u.var_name for u in second] == ['FROM_CACHE']
+    assert second[0].filename == first[0].filename
+
+def test_cached_scan_rescans_modified_files(project):
+    scan_directory(str(project), workers=1, cache=True)
+    (project / "app.py").write_text("import os\nkey = os.getenv('NEW_KEY')\nother = 1\n")
+
+    usages = scan_directory(str(project), workers=1, cache=True)
+    assert [u.var_name for u in usages] == ['NEW_KEY']
+
+def test_cached_scan_reuses_results_for_identical_content(project):
+    scan_directory(str(project), workers=1, cache=True)
+    manifest = load_manifest(str(project), SCANNER_VERSION)
+    key = os.path.abspath(str(project / "app.py"))
+    manifest['files'][key][3] = [['FROM_CACHE', 2, 'python_getenv']]
+    save_manifest(str(project), manifest)
+
+    # A fresh checkout rewrites mtimes but not content.
+    st = os.stat(project / "app.py")
+    os.utime(project / "app.py", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    usages = scan_directory(str(project), workers=1, cache=True)
+    assert [u.var_name for u in usages] == ['FROM_CACHE']
+    assert load_manifest(str(project), SCANNER_VERSION)['files'][key][0] == st.st_mtime_ns + 10**9
+
+def test_cached_parallel_scan_matches_uncached(project):
+    for i in range(20):
+        (project / f"mod{i}.py").write_text(f"import os\nv = os.environ['VAR_{i}']\n")
+    expected = scan_directory(str(project), workers=1)
+
+    assert scan_directory(str(project), workers=2, cache=True) == expected
+    digests = {entry[2] for entry in load_manifest(str(project), SCANNER_VERSION)['files'].values()}
+    assert len(digests) == 21 and all(d.startswith('python:') for d in digests)
+
+    # Touch every file: the pool hashes them and reuses the cached usages.
+    for filepath in project.iterdir():
+        st = os.stat(filepath)
+        os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert scan_directory(str(project), workers=2, cache=True) == expected
+
+def test_cached_scan_retries_unreadable_files(project, monkeypatch):
+    from envguard.scanners import code_scanner
+
+    def unreadable(*args, **kwargs):
+        raise PermissionError("denied")
+
+    # chmod changes neither mtime nor size, so a cached miss would stick.
+    monkeypatch.setattr(code_scanner, 'open', unreadable, raising=False)
+    assert scan_directory(str(project), workers=1, cache=True) == []
+    key = os.path.abspath(str(project / "app.py"))
+    assert key not in load_manifest(str(project), SCANNER_VERSION)['files']
+
+    monkeypatch.delattr(code_scanner, 'open')
+    usages = scan_directory(str(project), workers=1, cache=True)
+    assert [u.var_name for u in usages] == ['API_KEY']
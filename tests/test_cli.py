@@ -0,0 +1,37 @@
+import pytest
+from click.testing import CliRunner
+from envguard.cli import main
+
+@pytest.mark.parametrize("workers", ["0", "-2"])
+def test_scan_rejects_non_positive_workers(tmp_path, workers):
+    result = CliRunner().invoke(main, ["scan", str(tmp_path), "--workers", workers])
+    assert result.exit_code == 2
+    assert "--workers" in result.output
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "app.py").write_text("import os\nkey = os.getenv('API_KEY')\n")
+    (root / ".env.example").write_text("API_KEY=\n")
+    return root
+
+def test_scan_writes_cache_by_default(project):
+    from envguard.cache import manifest_path
+    result = CliRunner().invoke(main, ["scan", str(project)])
+    assert result.exit_code == 0
+    assert manifest_path(str(project)).exists()
+
+def test_scan_no_cache_neither_reads_nor_writes(project, monkeypatch):
+    from envguard.cache import manifest_path
+    from envguard.scanners import code_scanner
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache used with --no-cache")
+
+    monkeypatch.setattr(code_scanner, "load_manifest", fail)
+    monkeypatch.setattr(code_scanner, "save_manifest", fail)
+    result = CliRunner().invoke(main, ["scan", str(project), "--no-cache", "--strict"])
+    assert result.exit_code == 0, result.output
+    assert not manifest_path(str(project)).exists()
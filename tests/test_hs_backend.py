@@ -0,0 +1,50 @@
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("hyperscan")
+
+from envguard.scanners import _hs_backend
+from envguard.scanners.code_scanner import PROBES, scan_buffer
+
+def _find_offsets(content, probes):
+    offsets = []
+    for probe in probes:
+        i = content.find(probe)
+        while i != -1:
+            offsets.append(i)
+            i = content.find(probe, i + 1)
+    return sorted(offsets)
+
+SOURCES = {
+    'python': (b"import os\nkey = os.environ['A']\n# os.getenv('B')\n"
+               b"x = config.settings.C\nos.environ.get('D') or os.getenv('E')\n"),
+    'js': (b"const a = process.env.A;\nconst b = process.env['B'];\n"
+           b"const c = import.meta.env.VITE_C; // process.env.D\n"),
+}
+
+@pytest.mark.parametrize("lang", sorted(SOURCES))
+def test_find_literals_matches_bytes_find(lang):
+    content = SOURCES[lang] * 50
+    assert _hs_backend.AVAILABLE
+    assert _hs_backend.find_literals(content, PROBES[lang]) == _find_offsets(content, PROBES[lang])
+
+@pytest.mark.parametrize("lang", sorted(SOURCES))
+def test_find_literals_scans_mmap_buffers(lang, tmp_path):
+    filepath = tmp_path / "big.src"
+    filepath.write_bytes(SOURCES[lang] * 5000)
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        expected = _find_offsets(content, PROBES[lang])
+        assert expected
+        assert _hs_backend.find_literals(content, PROBES[lang]) == expected
+
+def test_find_literals_without_matches():
+    assert _hs_backend.find_literals(b"nothing to see here\n", PROBES['python']) == []
+
+def test_scan_buffer_from_many_threads():
+    content = SOURCES['python'] * 1000
+    expected = scan_buffer(content, 'python')
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: scan_buffer(content, 'python'), range(32)))
+    assert all(result == expected for result in results)
@@ -1,6 +1,8 @@
 import os
+import pickle
 import tempfile
-from envguard.scanners.code_scanner import scan_file, scan_directory, get_unique_vars
+from pathlib import Path
+from envguard.scanners.code_scanner import EnvUsage, scan_file, scan_buffer, scan_directory, iter_scan_directory, get_unique_vars
 from envguard.scanners.env_scanner import parse_env_file, find_missing, find_orphaned
 
 def test_scan_python_os_environ():
@@ -96,4 +98,280 @@ def test_get_unique_vars():
 
         usages = scan_directory(tmpdir)
         unique_vars = get_unique_vars(usages)
-        assert unique_vars == {'KEY_A', 'KEY_B'}
\ No newline at end of file
+        assert unique_vars == {'KEY_A', 'KEY_B'}
+        assert get_unique_vars(iter_scan_directory(tmpdir, workers=1)) == unique_vars
+
+def test_scan_js_mixed_patterns_on_one_line():
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.ts', delete=False) as f:
+        f.write("const a = [process.env['API_URL'], import.meta.env.VITE_KEY, process.env.PORT];")
+        filepath = f.name
+
+    usages = scan_file(filepath)
+    os.unlink(filepath)
+
+    assert [(u.var_name, u.usage_type) for u in usages] == [
+        ('API_URL', 'js_process_env_bracket'),
+        ('VITE_KEY', 'vite_env'),
+        ('PORT', 'js_process_env'),
+    ]
+
+
+def test_scan_reports_line_numbers_across_file():
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(
+            "import os\n"
+            "\n"
+            "    # skipped = os.getenv('SKIPPED')\n"
+            "a = os.getenv('FIRST')\n"
+            "b = os.environ['SECOND']; c = os.environ.get('THIRD')\n"
+        )
+        filepath = f.name
+
+    usages = scan_file(filepath)
+    os.unlink(filepath)
+
+    assert [(u.var_name, u.line_number) for u in usages] == [
+        ('FIRST', 4),
+        ('SECOND', 5),
+        ('THIRD', 5),
+    ]
+
+
+def test_scan_empty_file():
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        filepath = f.name
+
+    usages = scan_file(filepath)
+    os.unlink(filepath)
+
+    assert usages == []
+
+
+def test_scan_directory_parallel_matches_sequential():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(40):
+            with open(os.path.join(tmpdir, f"mod{i}.py"), "w") as f:
+                f.write(f"import os\nkey=os.getenv('KEY_{i}')")
+
+        sequential = scan_directory(tmpdir, workers=1)
+        parallel = scan_directory(tmpdir, workers=2)
+        assert len(sequential) == 40
+        assert parallel == sequential
+
+
+class _RecordingExecutor:
+    """In-process stand-in for ProcessPoolExecutor that records its sizing."""
+    calls = []
+
+    def __init__(self, max_workers=None, **kwargs):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, items, chunksize=1):
+        self.calls.append((self.max_workers, chunksize))
+        return map(fn, items)
+
+
+def test_scan_directory_pool_sizing(tmp_path, monkeypatch):
+    from envguard.scanners import code_scanner
+    monkeypatch.setattr(code_scanner, 'ProcessPoolExecutor', _RecordingExecutor)
+    monkeypatch.setattr(_RecordingExecutor, 'calls', [])
+    for i in range(20):
+        (tmp_path / f"mod{i}.py").write_text(f"import os\nkey=os.getenv('KEY_{i}')")
+
+    # One CPU: no pool at all.
+    monkeypatch.setattr(code_scanner.os, 'cpu_count', lambda: 1)
+    assert len(scan_directory(str(tmp_path))) == 20
+    assert _RecordingExecutor.calls == []
+
+    # Small trees are split so that every started worker gets a chunk.
+    assert len(scan_directory(str(tmp_path), workers=8)) == 20
+    assert len(scan_directory(str(tmp_path), workers=64)) == 20
+    assert _RecordingExecutor.calls == [(8, 1), (20, 1)]
+
+
+def test_scan_excludes_node_modules():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.makedirs(os.path.join(tmpdir, "node_modules", "pkg"))
+        with open(os.path.join(tmpdir, "node_modules", "pkg", "index.js"), "w") as f:
+            f.write("const x = process.env.VENDORED;")
+        os.makedirs(os.path.join(tmpdir, ".tox", "py39"))
+        with open(os.path.join(tmpdir, ".tox", "py39", "conftest.py"), "w") as f:
+            f.write("import os\nkey=os.getenv('TOX_ENV')")
+        with open(os.path.join(tmpdir, "app.js"), "w") as f:
+            f.write("const y = process.env.APP_PORT;")
+        os.makedirs(os.path.join(tmpdir, "src", "lib"))
+        with open(os.path.join(tmpdir, "src", "lib", "db.js"), "w") as f:
+            f.write("const z = process.env.DB_URL;")
+
+        usages = scan_directory(tmpdir, workers=1)
+        assert get_unique_vars(usages) == {'APP_PORT', 'DB_URL'}
+
+
+def test_scan_respects_ignore_files():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, ".gitignore"), "w") as f:
+            f.write("# build output\ngenerated/\n*.min.js\n")
+        with open(os.path.join(tmpdir, ".envguardignore"), "w") as f:
+            f.write("/fixtures\n")
+        files = {
+            "app.js": "process.env.APP_PORT",
+            os.path.join("generated", "api.py"): "os.getenv('GENERATED')",
+            os.path.join("src", "generated", "client.js"): "process.env.NESTED_GEN",
+            os.path.join("src", "bundle.min.js"): "process.env.MINIFIED",
+            os.path.join("fixtures", "sample.py"): "os.getenv('FIXTURE')",
+            os.path.join("src", "fixtures", "real.py"): "os.getenv('REAL')",
+        }
+        for name, body in files.items():
+            filepath = os.path.join(tmpdir, name)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            with open(filepath, "w") as f:
+                f.write(body)
+
+        usages = scan_directory(tmpdir, workers=1)
+        assert get_unique_vars(usages) == {'APP_PORT', 'REAL'}
+
+
+def test_scan_config_and_settings_attrs():
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write("url = config.database_url\ndebug = settings.DEBUG\n")
+        filepath = f.name
+
+    usages = scan_file(filepath)
+    os.unlink(filepath)
+
+    assert [(u.var_name, u.usage_type) for u in usages] == [
+        ('DATABASE_URL', 'config_attr'),
+        ('DEBUG', 'settings_attr'),
+    ]
+
+
+def test_scan_directory_groups_dominant_language_first():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, "a.js"), "w") as f:
+            f.write("const x = process.env.JS_KEY;")
+        for name in ("b.py", "c.py"):
+            with open(os.path.join(tmpdir, name), "w") as f:
+                f.write("import os\nkey=os.getenv('PY_KEY')")
+
+        usages = scan_directory(tmpdir, workers=1)
+        assert [u.var_name for u in usages] == ['PY_KEY', 'PY_KEY', 'JS_KEY']
+
+
+def test_find_missing_and_orphaned_with_empty_side():
+    assert find_missing({'API_KEY', 'PATH'}, set()) == {'API_KEY'}
+    assert find_missing(set(), {'API_KEY'}) == set()
+    assert find_orphaned(set(), {'UNUSED_VAR'}) == {'UNUSED_VAR'}
+    assert find_orphaned({'API_KEY'}, set()) == set()
+
+
+def test_iter_scan_directory_streams_usages():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, "test.py"), "w") as f:
+            f.write("import os\nkey=os.getenv('MY_KEY')")
+
+        usages = iter_scan_directory(tmpdir, workers=1)
+        assert not isinstance(usages, list)
+        assert [u.var_name for u in usages] == ['MY_KEY']
+
+
+def test_scan_buffer_returns_records():
+    source = b"// process.env.COMMENTED\nconst url = process.env.API_URL;\n"
+    assert scan_buffer(source, 'js') == [('API_URL', 2, 'js_process_env')]
+
+
+def test_parse_env_file_export_and_indent():
+    content = "export KEY1=VALUE1\n  # KEY3=commented\n  KEY2 = value\r\nnot a var\n"
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, newline='') as f:
+        f.write(content)
+        filepath = f.name
+
+    variables = parse_env_file(filepath)
+    os.unlink(filepath)
+
+    assert variables == {'KEY1', 'KEY2'}
+
+
+def test_parse_env_file_nonexistent():
+    assert parse_env_file("/nonexistent/.env.example") == set()
+
+
+def test_parse_env_file_sees_edits():
+    with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+        f.write("KEY1=VALUE1\n")
+        filepath = f.name
+
+    first = parse_env_file(filepath)
+    first.add('MUTATED')
+    with open(filepath, 'a') as f:
+        f.write("KEY2=VALUE2\n")
+    second = parse_env_file(filepath)
+    os.unlink(filepath)
+
+    assert second == {'KEY1', 'KEY2'}
+
+
+def test_env_usage_is_slotted_hashable_and_picklable():
+    usage = EnvUsage('API_KEY', 'app.py', 3, 'python_getenv')
+
+    assert not hasattr(usage, '__dict__')
+    assert {usage, EnvUsage('API_KEY', 'app.py', 3, 'python_getenv')} == {usage}
+    assert pickle.loads(pickle.dumps(usage)) == usage
+
+
+def test_scan_file_memory_maps_large_files(monkeypatch):
+    from envguard.scanners import code_scanner
+    monkeypatch.setattr(code_scanner, 'MMAP_THRESHOLD', 1)
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write("import os\nsecret = os.getenv('DB_SECRET')")
+        filepath = f.name
+
+    usages = scan_file(filepath)
+    os.unlink(filepath)
+
+    assert [(u.var_name, u.line_number) for u in usages] == [('DB_SECRET', 2)]
+
+
+def test_patterns_compiled_once_per_process():
+    from envguard.scanners import _patterns
+    regex, usage_types = _patterns.code_regex('python')
+    assert _patterns.code_regex('python')[0] is regex
+    assert set(usage_types.values()) == {t for _, t in _patterns.PYTHON_PATTERNS}
+    assert _patterns.actions_regex() is _patterns.actions_regex()
+
+
+def test_scan_file_accepts_path(tmp_path):
+    filepath = tmp_path / "app.py"
+    filepath.write_text("import os\nkey = os.getenv('API_KEY')\n")
+
+    usages = scan_file(Path(filepath))
+    assert [(u.var_name, u.filename) for u in usages] == [('API_KEY', str(filepath))]
+
+
+def test_find_env_file_sees_new_files(tmp_path):
+    from envguard.scanners.env_scanner import find_env_file
+    assert find_env_file(str(tmp_path)) is None
+    (tmp_path / ".env.example").write_text("API_KEY=\n")
+    assert find_env_file(str(tmp_path)) == str(tmp_path / ".env.example")
+
+
+def test_scan_buffer_reports_overlapping_patterns():
+    # Each pattern matches independently, as if run on its own.
+    assert scan_buffer(b"x = config.settings.FOO\n", 'python') == [
+        ('SETTINGS', 1, 'config_attr'),
+        ('FOO', 1, 'settings_attr'),
+    ]
+    assert scan_buffer(b"process.env.process.env.KEY\n", 'js') == [
+        ('PROCESS', 1, 'js_process_env'),
+    ]
+
+
+def test_scan_buffer_rejects_non_ascii_names():
+    content = "a = config.naïve\nb = os.getenv('CAFÉ')\nc = settings.abcé\nd = config.OK\n"
+    assert scan_buffer(content.encode('utf-8'), 'python') == [('OK', 4, 'config_attr')]
+    assert scan_buffer("process.env.PORTÉ\n".encode('utf-8'), 'js') == []